@@ -9,6 +9,7 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REDIS_URL: Optional[str] = None
+    CACHE_ENABLED: bool = True  # Kill switch: False disables caching even with REDIS_URL set
 
     class Config:
         env_file = ".env"
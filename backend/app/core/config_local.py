@@ -9,6 +9,7 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
     REDIS_URL: Optional[str] = None  # Redis is optional - app works without it
+    CACHE_ENABLED: bool = True
 
     class Config:
         env_file = ".env"
@@ -1,17 +1,30 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 
 # Use local config and database for testing
 from app.core.database_sqlite import engine, Base
 from app.routers import auth, categories, transactions, budgets, analytics
+from app.utils.cache import close_cache
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Create database tables
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    yield
+    await close_cache()
+    await engine.dispose()
 
-# Create database tables
-Base.metadata.create_all(bind=engine)
 
 app = FastAPI(
     title="Expense Tracker API",
     description="A comprehensive personal finance management API with expense tracking, budgeting, and analytics",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Date, Enum
+from sqlalchemy import Column, Integer, String, Float, ForeignKey, DateTime, Date, Enum, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.core.database import Base
@@ -8,7 +8,7 @@ from .category import TransactionType
 class Transaction(Base):
     __tablename__ = "transactions"
 
-    id = Column(Integer, primary_key=True, index=True)
+    id = Column(Integer, primary_key=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
     category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
     amount = Column(Float, nullable=False)
@@ -20,3 +20,10 @@ class Transaction(Base):
     # Relationships
     user = relationship("User", back_populates="transactions")
     category = relationship("Category", back_populates="transactions")
+
+    __table_args__ = (
+        # Analytics: per-user date range filtered by type, summing amount
+        Index("ix_tx_user_date_type", "user_id", "date", "type", postgresql_include=["amount"]),
+        # Budget status: per-user category spending over a date range
+        Index("ix_tx_user_cat_date", "user_id", "category_id", "date"),
+    )
@@ -1,115 +1,134 @@
 from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import func, extract
-from typing import Optional
-from datetime import date, datetime, timedelta
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, func, extract, case, bindparam
+from typing import Tuple
+from datetime import date
 from app.core.database import get_db
 from app.models.user import User
 from app.models.transaction import Transaction
 from app.models.category import Category, TransactionType
-from app.utils.dependencies import get_current_user
-from app.utils.cache import get_cache, set_cache
+from app.utils.dependencies import get_current_user, month_range
+from app.utils.cache import cache_response
 
 router = APIRouter(prefix="/analytics", tags=["Analytics"])
 
+# Transaction type filters, built once rather than on every request
+IS_INCOME = Transaction.type == TransactionType.INCOME
+IS_EXPENSE = Transaction.type == TransactionType.EXPENSE
+
+# Aggregate queries are built once at import and executed with bound
+# parameters, so requests skip statement construction
+IN_DATE_RANGE = (
+    Transaction.user_id == bindparam("user_id"),
+    Transaction.date >= bindparam("start_date"),
+    Transaction.date <= bindparam("end_date")
+)
+
+SUMMARY_QUERY = select(
+    func.coalesce(func.sum(case(
+        (IS_INCOME, Transaction.amount), else_=0
+    )), 0).label("income"),
+    func.coalesce(func.sum(case(
+        (IS_EXPENSE, Transaction.amount), else_=0
+    )), 0).label("expense")
+).where(*IN_DATE_RANGE)
+
+
+def _category_totals_query(type_filter):
+    return select(
+        Category.name,
+        Category.id,
+        func.sum(Transaction.amount).label("total")
+    ).join(
+        Transaction, Transaction.category_id == Category.id
+    ).where(
+        type_filter, *IN_DATE_RANGE
+    ).group_by(
+        Category.id, Category.name
+    )
+
+
+CATEGORY_TOTALS_QUERIES = {
+    TransactionType.INCOME: _category_totals_query(IS_INCOME),
+    TransactionType.EXPENSE: _category_totals_query(IS_EXPENSE),
+}
+
+BY_CATEGORY_QUERY = select(
+    Category.name,
+    Category.id,
+    Transaction.type,
+    func.sum(Transaction.amount).label("total")
+).join(
+    Transaction, Transaction.category_id == Category.id
+).where(
+    *IN_DATE_RANGE
+).group_by(
+    Category.id, Category.name, Transaction.type
+)
+
+MONTHLY_TREND_QUERY = select(
+    extract('year', Transaction.date).label('year'),
+    extract('month', Transaction.date).label('month'),
+    Transaction.type,
+    func.sum(Transaction.amount).label('total')
+).where(
+    Transaction.user_id == bindparam("user_id"),
+    Transaction.date >= bindparam("window_start"),
+    Transaction.date < bindparam("window_end")
+).group_by(
+    'year', 'month', Transaction.type
+)
+
 
 @router.get("/summary")
-def get_financial_summary(
-    start_date: Optional[date] = Query(None, description="Start date for summary"),
-    end_date: Optional[date] = Query(None, description="End date for summary"),
+@cache_response("summary", namespace="analytics")
+async def get_financial_summary(
+    date_range: Tuple[date, date] = Depends(month_range),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get financial summary with total income, expenses, and balance"""
-    # Default to current month if no dates provided
-    if not start_date or not end_date:
-        today = datetime.now()
-        start_date = date(today.year, today.month, 1)
-        # Get last day of month
-        if today.month == 12:
-            end_date = date(today.year + 1, 1, 1) - timedelta(days=1)
-        else:
-            end_date = date(today.year, today.month + 1, 1) - timedelta(days=1)
-
-    # Check cache
-    cache_key = f"analytics:{current_user.id}:summary:{start_date}:{end_date}"
-    cached = get_cache(cache_key)
-    if cached:
-        return cached
-
-    # Calculate total income
-    total_income = db.query(func.sum(Transaction.amount)).filter(
-        Transaction.user_id == current_user.id,
-        Transaction.type == TransactionType.INCOME,
-        Transaction.date >= start_date,
-        Transaction.date <= end_date
-    ).scalar() or 0.0
-
-    # Calculate total expenses
-    total_expenses = db.query(func.sum(Transaction.amount)).filter(
-        Transaction.user_id == current_user.id,
-        Transaction.type == TransactionType.EXPENSE,
-        Transaction.date >= start_date,
-        Transaction.date <= end_date
-    ).scalar() or 0.0
+    start_date, end_date = date_range
+
+    # Calculate total income and expenses in a single pass
+    totals = (await db.execute(SUMMARY_QUERY, {
+        "user_id": current_user.id,
+        "start_date": start_date,
+        "end_date": end_date
+    })).one()
+
+    total_income = float(totals.income)
+    total_expenses = float(totals.expense)
 
     balance = total_income - total_expenses
 
     result = {
-        "start_date": start_date.isoformat(),
-        "end_date": end_date.isoformat(),
+        "start_date": start_date,
+        "end_date": end_date,
         "total_income": round(total_income, 2),
         "total_expenses": round(total_expenses, 2),
         "balance": round(balance, 2),
         "savings_rate": round((balance / total_income * 100) if total_income > 0 else 0, 2)
     }
 
-    # Cache for 5 minutes
-    set_cache(cache_key, result, expiry=300)
-
     return result
 
 
-@router.get("/spending-by-category")
-def get_spending_by_category(
-    start_date: Optional[date] = Query(None, description="Start date"),
-    end_date: Optional[date] = Query(None, description="End date"),
-    current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
-):
-    """Get spending breakdown by category"""
-    # Default to current month if no dates provided
-    if not start_date or not end_date:
-        today = datetime.now()
-        start_date = date(today.year, today.month, 1)
-        if today.month == 12:
-            end_date = date(today.year + 1, 1, 1) - timedelta(days=1)
-        else:
-            end_date = date(today.year, today.month + 1, 1) - timedelta(days=1)
-
-    # Check cache
-    cache_key = f"analytics:{current_user.id}:spending_by_category:{start_date}:{end_date}"
-    cached = get_cache(cache_key)
-    if cached:
-        return cached
-
-    # Query spending by category
-    results = db.query(
-        Category.name,
-        Category.id,
-        func.sum(Transaction.amount).label("total")
-    ).join(
-        Transaction, Transaction.category_id == Category.id
-    ).filter(
-        Transaction.user_id == current_user.id,
-        Transaction.type == TransactionType.EXPENSE,
-        Transaction.date >= start_date,
-        Transaction.date <= end_date
-    ).group_by(
-        Category.id, Category.name
-    ).all()
-
-    data = [
+async def _by_category(
+    db: AsyncSession,
+    user_id: int,
+    tx_type: TransactionType,
+    start_date: date,
+    end_date: date
+) -> list:
+    """Sum transactions of one type per category over a date range"""
+    results = (await db.execute(CATEGORY_TOTALS_QUERIES[tx_type], {
+        "user_id": user_id,
+        "start_date": start_date,
+        "end_date": end_date
+    })).all()
+
+    return [
         {
             "category_id": r.id,
             "category_name": r.name,
@@ -118,131 +137,134 @@ def get_spending_by_category(
         for r in results
     ]
 
+
+@router.get("/spending-by-category")
+@cache_response("spending_by_category", namespace="analytics")
+async def get_spending_by_category(
+    date_range: Tuple[date, date] = Depends(month_range),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get spending breakdown by category"""
+    start_date, end_date = date_range
+
     result = {
-        "start_date": start_date.isoformat(),
-        "end_date": end_date.isoformat(),
-        "data": data
+        "start_date": start_date,
+        "end_date": end_date,
+        "data": await _by_category(db, current_user.id, TransactionType.EXPENSE, start_date, end_date)
     }
 
-    # Cache for 5 minutes
-    set_cache(cache_key, result, expiry=300)
-
     return result
 
 
 @router.get("/income-by-category")
-def get_income_by_category(
-    start_date: Optional[date] = Query(None, description="Start date"),
-    end_date: Optional[date] = Query(None, description="End date"),
+@cache_response("income_by_category", namespace="analytics")
+async def get_income_by_category(
+    date_range: Tuple[date, date] = Depends(month_range),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get income breakdown by category"""
-    # Default to current month
-    if not start_date or not end_date:
-        today = datetime.now()
-        start_date = date(today.year, today.month, 1)
-        if today.month == 12:
-            end_date = date(today.year + 1, 1, 1) - timedelta(days=1)
-        else:
-            end_date = date(today.year, today.month + 1, 1) - timedelta(days=1)
+    start_date, end_date = date_range
 
-    # Check cache
-    cache_key = f"analytics:{current_user.id}:income_by_category:{start_date}:{end_date}"
-    cached = get_cache(cache_key)
-    if cached:
-        return cached
+    result = {
+        "start_date": start_date,
+        "end_date": end_date,
+        "data": await _by_category(db, current_user.id, TransactionType.INCOME, start_date, end_date)
+    }
 
-    # Query income by category
-    results = db.query(
-        Category.name,
-        Category.id,
-        func.sum(Transaction.amount).label("total")
-    ).join(
-        Transaction, Transaction.category_id == Category.id
-    ).filter(
-        Transaction.user_id == current_user.id,
-        Transaction.type == TransactionType.INCOME,
-        Transaction.date >= start_date,
-        Transaction.date <= end_date
-    ).group_by(
-        Category.id, Category.name
-    ).all()
+    return result
 
-    data = [
-        {
+
+@router.get("/by-category")
+@cache_response("by_category", namespace="analytics")
+async def get_totals_by_category(
+    date_range: Tuple[date, date] = Depends(month_range),
+    current_user: User = Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    """Get income and spending breakdowns by category in one call"""
+    start_date, end_date = date_range
+
+    # Query both transaction types grouped by category
+    results = (await db.execute(BY_CATEGORY_QUERY, {
+        "user_id": current_user.id,
+        "start_date": start_date,
+        "end_date": end_date
+    })).all()
+
+    income = []
+    expense = []
+    for r in results:
+        entry = {
             "category_id": r.id,
             "category_name": r.name,
             "total": round(r.total, 2)
         }
-        for r in results
-    ]
+        if r.type == TransactionType.INCOME:
+            income.append(entry)
+        else:
+            expense.append(entry)
 
     result = {
-        "start_date": start_date.isoformat(),
-        "end_date": end_date.isoformat(),
-        "data": data
+        "start_date": start_date,
+        "end_date": end_date,
+        "income": income,
+        "expense": expense
     }
 
-    # Cache for 5 minutes
-    set_cache(cache_key, result, expiry=300)
-
     return result
 
 
 @router.get("/monthly-trend")
-def get_monthly_trend(
+@cache_response("monthly_trend", namespace="analytics", expiry=600)
+async def get_monthly_trend(
     months: int = Query(6, ge=1, le=24, description="Number of months to include"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get monthly income and expense trends"""
-    # Check cache
-    cache_key = f"analytics:{current_user.id}:monthly_trend:{months}"
-    cached = get_cache(cache_key)
-    if cached:
-        return cached
+    # Only scan the requested window: the first day of the month (months - 1)
+    # months ago up to the end of the current month
+    today = date.today()
+    first_month = today.year * 12 + today.month - months
+    window_start = date(first_month // 12, first_month % 12 + 1, 1)
+    if today.month == 12:
+        window_end = date(today.year + 1, 1, 1)
+    else:
+        window_end = date(today.year, today.month + 1, 1)
 
     # Query transactions grouped by month
-    results = db.query(
-        extract('year', Transaction.date).label('year'),
-        extract('month', Transaction.date).label('month'),
-        Transaction.type,
-        func.sum(Transaction.amount).label('total')
-    ).filter(
-        Transaction.user_id == current_user.id
-    ).group_by(
-        'year', 'month', Transaction.type
-    ).order_by(
-        'year', 'month'
-    ).all()
-
-    # Organize data by month
-    monthly_data = {}
+    results = (await db.execute(MONTHLY_TREND_QUERY, {
+        "user_id": current_user.id,
+        "window_start": window_start,
+        "window_end": window_end
+    })).all()
+
+    # Scatter totals into one slot per month of the window; the slot order
+    # is chronological, so the query needs no ORDER BY
+    income = [0.0] * months
+    expense = [0.0] * months
+    has_data = [False] * months
     for r in results:
-        month_key = f"{int(r.year)}-{int(r.month):02d}"
-        if month_key not in monthly_data:
-            monthly_data[month_key] = {"income": 0.0, "expense": 0.0}
-
+        slot = int(r.year) * 12 + int(r.month) - 1 - first_month
+        has_data[slot] = True
         if r.type == TransactionType.INCOME:
-            monthly_data[month_key]["income"] = round(r.total, 2)
+            income[slot] = round(r.total, 2)
         else:
-            monthly_data[month_key]["expense"] = round(r.total, 2)
+            expense[slot] = round(r.total, 2)
 
-    # Convert to list and limit to requested months
     trend_data = [
         {
-            "month": month,
-            "income": data["income"],
-            "expense": data["expense"],
-            "balance": round(data["income"] - data["expense"], 2)
+            "month": f"{(first_month + slot) // 12}-{(first_month + slot) % 12 + 1:02d}",
+            "income": income[slot],
+            "expense": expense[slot],
+            "balance": round(income[slot] - expense[slot], 2)
         }
-        for month, data in sorted(monthly_data.items(), reverse=True)[:months]
+        for slot in range(months)
+        if has_data[slot]
     ]
 
-    result = {"data": list(reversed(trend_data))}
-
-    # Cache for 10 minutes
-    set_cache(cache_key, result, expiry=600)
+    result = {"data": trend_data}
 
     return result
@@ -1,34 +1,33 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-from sqlalchemy import func
+from fastapi.responses import ORJSONResponse, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, select, update
 from typing import List
 from datetime import date
 from app.core.database import get_db
 from app.models.user import User
 from app.models.budget import Budget
-from app.models.category import Category
+from app.models.category import Category, TransactionType
 from app.models.transaction import Transaction
+from app.schemas.base import from_orm_fast, list_adapter
 from app.schemas.budget import BudgetCreate, BudgetUpdate, BudgetResponse
 from app.utils.dependencies import get_current_user
-from app.utils.cache import delete_cache
+from app.utils.cache import bump_version
 
 router = APIRouter(prefix="/budgets", tags=["Budgets"])
 
 
 @router.post("/", response_model=BudgetResponse, status_code=status.HTTP_201_CREATED)
-def create_budget(
+async def create_budget(
     budget_data: BudgetCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new budget"""
     # Verify category belongs to user
-    category = db.query(Category).filter(
-        Category.id == budget_data.category_id,
-        Category.user_id == current_user.id
-    ).first()
+    category = await db.get(Category, budget_data.category_id)
 
-    if not category:
+    if not category or category.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Category not found"
@@ -51,73 +50,83 @@ def create_budget(
     )
 
     db.add(new_budget)
-    db.commit()
-    db.refresh(new_budget)
+    await db.commit()
+    await db.refresh(new_budget)
 
     # Invalidate cache
-    delete_cache(f"budgets:{current_user.id}:*")
-    delete_cache(f"analytics:{current_user.id}:*")
+    await bump_version(current_user.id, "analytics")
 
     return new_budget
 
 
 @router.get("/", response_model=List[BudgetResponse])
-def get_budgets(
+async def get_budgets(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get all budgets for current user"""
-    budgets = db.query(Budget).filter(Budget.user_id == current_user.id).all()
-    return budgets
+    result = await db.execute(select(*Budget.__table__.c).where(Budget.user_id == current_user.id))
+    budgets = result.all()
+    # Rows come straight from the database: build the models without
+    # re-validating and serialize the whole list in one pass
+    return Response(
+        content=list_adapter(BudgetResponse).dump_json([from_orm_fast(BudgetResponse, row) for row in budgets]),
+        media_type="application/json"
+    )
 
 
 @router.get("/{budget_id}", response_model=BudgetResponse)
-def get_budget(
+async def get_budget(
     budget_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get a specific budget"""
-    budget = db.query(Budget).filter(
-        Budget.id == budget_id,
-        Budget.user_id == current_user.id
-    ).first()
+    budget = await db.get(Budget, budget_id)
 
-    if not budget:
+    if not budget or budget.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Budget not found"
         )
 
-    return budget
+    return ORJSONResponse(from_orm_fast(BudgetResponse, budget).model_dump(mode="json"))
 
 
 @router.get("/{budget_id}/status")
-def get_budget_status(
+async def get_budget_status(
     budget_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get budget status with spending information"""
-    budget = db.query(Budget).filter(
-        Budget.id == budget_id,
-        Budget.user_id == current_user.id
-    ).first()
+    # Total spent in the budget's category over its period, computed in the same query
+    spent = select(
+        func.coalesce(func.sum(Transaction.amount), 0)
+    ).where(
+        Transaction.user_id == Budget.user_id,
+        Transaction.category_id == Budget.category_id,
+        Transaction.date >= Budget.start_date,
+        Transaction.date <= Budget.end_date,
+        Transaction.type == TransactionType.EXPENSE
+    ).correlate(Budget).scalar_subquery()
+
+    result = await db.execute(
+        select(Budget, spent.label("spent")).where(
+            Budget.id == budget_id,
+            Budget.user_id == current_user.id
+        )
+    )
+    row = result.one_or_none()
 
-    if not budget:
+    if not row:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Budget not found"
         )
 
-    # Calculate total spent in this budget period
-    total_spent = db.query(func.sum(Transaction.amount)).filter(
-        Transaction.user_id == current_user.id,
-        Transaction.category_id == budget.category_id,
-        Transaction.date >= budget.start_date,
-        Transaction.date <= budget.end_date,
-        Transaction.type == "expense"
-    ).scalar() or 0.0
+    budget = row.Budget
+    total_spent = float(row.spent)
 
     remaining = budget.amount - total_spent
     percentage_used = (total_spent / budget.amount * 100) if budget.amount > 0 else 0
@@ -136,89 +145,78 @@ def get_budget_status(
 
 
 @router.put("/{budget_id}", response_model=BudgetResponse)
-def update_budget(
+async def update_budget(
     budget_id: int,
     budget_data: BudgetUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update a budget"""
-    budget = db.query(Budget).filter(
-        Budget.id == budget_id,
-        Budget.user_id == current_user.id
-    ).first()
+    budget = await db.get(Budget, budget_id)
 
-    if not budget:
+    if not budget or budget.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Budget not found"
         )
 
+    changes = budget_data.model_dump(exclude_none=True)
+
     # Verify category if provided
-    if budget_data.category_id is not None:
-        category = db.query(Category).filter(
-            Category.id == budget_data.category_id,
-            Category.user_id == current_user.id
-        ).first()
+    if "category_id" in changes:
+        category = await db.get(Category, changes["category_id"])
 
-        if not category:
+        if not category or category.user_id != current_user.id:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Category not found"
             )
 
-    # Update fields
-    if budget_data.category_id is not None:
-        budget.category_id = budget_data.category_id
-    if budget_data.amount is not None:
-        budget.amount = budget_data.amount
-    if budget_data.period is not None:
-        budget.period = budget_data.period
-    if budget_data.start_date is not None:
-        budget.start_date = budget_data.start_date
-    if budget_data.end_date is not None:
-        budget.end_date = budget_data.end_date
-
     # Validate dates
-    if budget.start_date >= budget.end_date:
+    start_date = changes.get("start_date", budget.start_date)
+    end_date = changes.get("end_date", budget.end_date)
+    if start_date >= end_date:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="End date must be after start date"
         )
 
-    db.commit()
-    db.refresh(budget)
+    # Update provided fields in a single statement and read back the row
+    if changes:
+        result = await db.execute(
+            update(Budget)
+            .where(Budget.id == budget_id)
+            .values(**changes)
+            .returning(*Budget.__table__.c)
+        )
+        budget = result.first()
+        await db.commit()
 
     # Invalidate cache
-    delete_cache(f"budgets:{current_user.id}:*")
-    delete_cache(f"analytics:{current_user.id}:*")
+    await bump_version(current_user.id, "analytics")
 
     return budget
 
 
 @router.delete("/{budget_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_budget(
+async def delete_budget(
     budget_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete a budget"""
-    budget = db.query(Budget).filter(
-        Budget.id == budget_id,
-        Budget.user_id == current_user.id
-    ).first()
+    budget = await db.get(Budget, budget_id)
 
-    if not budget:
+    if not budget or budget.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Budget not found"
         )
 
-    db.delete(budget)
-    db.commit()
+    await db.delete(budget)
+    await db.commit()
 
     # Invalidate cache
-    delete_cache(f"budgets:{current_user.id}:*")
-    delete_cache(f"analytics:{current_user.id}:*")
+    await bump_version(current_user.id, "analytics")
 
     return None
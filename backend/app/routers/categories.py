@@ -1,21 +1,24 @@
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from fastapi.responses import ORJSONResponse, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update
 from typing import List
 from app.core.database import get_db
 from app.models.user import User
 from app.models.category import Category
+from app.schemas.base import from_orm_fast, list_adapter
 from app.schemas.category import CategoryCreate, CategoryUpdate, CategoryResponse
 from app.utils.dependencies import get_current_user
-from app.utils.cache import delete_cache
+from app.utils.cache import bump_version
 
 router = APIRouter(prefix="/categories", tags=["Categories"])
 
 
 @router.post("/", response_model=CategoryResponse, status_code=status.HTTP_201_CREATED)
-def create_category(
+async def create_category(
     category_data: CategoryCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new category"""
     new_category = Category(
@@ -25,59 +28,70 @@ def create_category(
     )
 
     db.add(new_category)
-    db.commit()
-    db.refresh(new_category)
+    await db.commit()
+    await db.refresh(new_category)
 
     # Invalidate cache
-    delete_cache(f"categories:{current_user.id}:*")
-    delete_cache(f"analytics:{current_user.id}:*")
+    await bump_version(current_user.id, "analytics")
 
     return new_category
 
 
 @router.get("/", response_model=List[CategoryResponse])
-def get_categories(
+async def get_categories(
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get all categories for current user"""
-    categories = db.query(Category).filter(Category.user_id == current_user.id).all()
-    return categories
+    result = await db.execute(select(*Category.__table__.c).where(Category.user_id == current_user.id))
+    categories = result.all()
+    # Rows come straight from the database: build the models without
+    # re-validating and serialize the whole list in one pass
+    return Response(
+        content=list_adapter(CategoryResponse).dump_json([from_orm_fast(CategoryResponse, row) for row in categories]),
+        media_type="application/json"
+    )
 
 
 @router.get("/{category_id}", response_model=CategoryResponse)
-def get_category(
+async def get_category(
     category_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get a specific category"""
-    category = db.query(Category).filter(
-        Category.id == category_id,
-        Category.user_id == current_user.id
-    ).first()
+    category = await db.get(Category, category_id)
 
-    if not category:
+    if not category or category.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Category not found"
         )
 
-    return category
+    return ORJSONResponse(from_orm_fast(CategoryResponse, category).model_dump(mode="json"))
 
 
 @router.put("/{category_id}", response_model=CategoryResponse)
-def update_category(
+async def update_category(
     category_id: int,
     category_data: CategoryUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update a category"""
-    category = db.query(Category).filter(
+    changes = category_data.model_dump(exclude_none=True)
+
+    # Update provided fields in a single statement and read back the row
+    if changes:
+        stmt = update(Category).values(**changes).returning(*Category.__table__.c)
+    else:
+        stmt = select(*Category.__table__.c)
+
+    result = await db.execute(stmt.where(
         Category.id == category_id,
         Category.user_id == current_user.id
-    ).first()
+    ))
+    category = result.first()
 
     if not category:
         raise HTTPException(
@@ -85,45 +99,33 @@ def update_category(
             detail="Category not found"
         )
 
-    # Update fields
-    if category_data.name is not None:
-        category.name = category_data.name
-    if category_data.type is not None:
-        category.type = category_data.type
-
-    db.commit()
-    db.refresh(category)
+    await db.commit()
 
     # Invalidate cache
-    delete_cache(f"categories:{current_user.id}:*")
-    delete_cache(f"analytics:{current_user.id}:*")
+    await bump_version(current_user.id, "analytics")
 
     return category
 
 
 @router.delete("/{category_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_category(
+async def delete_category(
     category_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete a category"""
-    category = db.query(Category).filter(
-        Category.id == category_id,
-        Category.user_id == current_user.id
-    ).first()
+    category = await db.get(Category, category_id)
 
-    if not category:
+    if not category or category.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Category not found"
         )
 
-    db.delete(category)
-    db.commit()
+    await db.delete(category)
+    await db.commit()
 
     # Invalidate cache
-    delete_cache(f"categories:{current_user.id}:*")
-    delete_cache(f"analytics:{current_user.id}:*")
+    await bump_version(current_user.id, "analytics")
 
     return None
@@ -1,32 +1,32 @@
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, update
 from typing import List, Optional
 from datetime import date
 from app.core.database import get_db
 from app.models.user import User
 from app.models.transaction import Transaction
 from app.models.category import Category, TransactionType
-from app.schemas.transaction import TransactionCreate, TransactionUpdate, TransactionResponse
+from app.schemas.base import from_orm_fast
+from app.schemas.transaction import TransactionCreate, TransactionUpdate, TransactionResponse, TransactionDict
 from app.utils.dependencies import get_current_user
-from app.utils.cache import delete_cache
+from app.utils.cache import bump_version, cache_response
 
 router = APIRouter(prefix="/transactions", tags=["Transactions"])
 
 
-@router.post("/", response_model=TransactionResponse, status_code=status.HTTP_201_CREATED)
-def create_transaction(
+@router.post("/", response_model=TransactionResponse, response_model_exclude_none=True, status_code=status.HTTP_201_CREATED)
+async def create_transaction(
     transaction_data: TransactionCreate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Create a new transaction (expense or income)"""
     # Verify category belongs to user
-    category = db.query(Category).filter(
-        Category.id == transaction_data.category_id,
-        Category.user_id == current_user.id
-    ).first()
+    category = await db.get(Category, transaction_data.category_id)
 
-    if not category:
+    if not category or category.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Category not found"
@@ -42,18 +42,36 @@ def create_transaction(
     )
 
     db.add(new_transaction)
-    db.commit()
-    db.refresh(new_transaction)
+    await db.commit()
+    await db.refresh(new_transaction)
 
     # Invalidate cache
-    delete_cache(f"transactions:{current_user.id}:*")
-    delete_cache(f"analytics:{current_user.id}:*")
+    await bump_version(current_user.id, "transactions", "analytics")
 
     return new_transaction
 
 
-@router.get("/", response_model=List[TransactionResponse])
-def get_transactions(
+def _transaction_dict(row) -> TransactionDict:
+    """Response shape of a transaction row, in TransactionResponse field
+    order and omitting an empty description"""
+    data: TransactionDict = {
+        "category_id": row.category_id,
+        "amount": row.amount,
+        "description": row.description,
+        "type": row.type,
+        "date": row.date,
+        "id": row.id,
+        "user_id": row.user_id,
+        "created_at": row.created_at
+    }
+    if row.description is None:
+        del data["description"]
+    return data
+
+
+@router.get("/", response_model=List[TransactionResponse], response_model_exclude_none=True)
+@cache_response("list", namespace="transactions")
+async def get_transactions(
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(50, ge=1, le=100, description="Number of records to return"),
     type: Optional[TransactionType] = Query(None, description="Filter by transaction type"),
@@ -61,60 +79,81 @@ def get_transactions(
     start_date: Optional[date] = Query(None, description="Filter from this date"),
     end_date: Optional[date] = Query(None, description="Filter until this date"),
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get transactions with pagination and filters"""
-    query = db.query(Transaction).filter(Transaction.user_id == current_user.id)
+    # Select plain columns: rows skip ORM instance and identity-map setup
+    query = select(*Transaction.__table__.c).where(Transaction.user_id == current_user.id)
 
     # Apply filters
     if type:
-        query = query.filter(Transaction.type == type)
+        query = query.where(Transaction.type == type)
     if category_id:
-        query = query.filter(Transaction.category_id == category_id)
+        query = query.where(Transaction.category_id == category_id)
     if start_date:
-        query = query.filter(Transaction.date >= start_date)
+        query = query.where(Transaction.date >= start_date)
     if end_date:
-        query = query.filter(Transaction.date <= end_date)
+        query = query.where(Transaction.date <= end_date)
 
     # Apply pagination and ordering
-    transactions = query.order_by(Transaction.date.desc()).offset(skip).limit(limit).all()
+    result = await db.execute(query.order_by(Transaction.date.desc()).offset(skip).limit(limit))
+    transactions = result.all()
 
-    return transactions
+    # Rows come straight from the database: return them as plain dicts
+    # without building response models
+    payload: List[TransactionDict] = [_transaction_dict(row) for row in transactions]
+    return payload
 
 
 @router.get("/{transaction_id}", response_model=TransactionResponse)
-def get_transaction(
+async def get_transaction(
     transaction_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Get a specific transaction"""
-    transaction = db.query(Transaction).filter(
-        Transaction.id == transaction_id,
-        Transaction.user_id == current_user.id
-    ).first()
+    transaction = await db.get(Transaction, transaction_id)
 
-    if not transaction:
+    if not transaction or transaction.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Transaction not found"
         )
 
-    return transaction
+    return ORJSONResponse(from_orm_fast(TransactionResponse, transaction).model_dump(mode="json", exclude_none=True))
 
 
-@router.put("/{transaction_id}", response_model=TransactionResponse)
-def update_transaction(
+@router.put("/{transaction_id}", response_model=TransactionResponse, response_model_exclude_none=True)
+async def update_transaction(
     transaction_id: int,
     transaction_data: TransactionUpdate,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Update a transaction"""
-    transaction = db.query(Transaction).filter(
+    changes = transaction_data.model_dump(exclude_none=True)
+
+    # Verify category if provided
+    if "category_id" in changes:
+        category = await db.get(Category, changes["category_id"])
+
+        if not category or category.user_id != current_user.id:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Category not found"
+            )
+
+    # Update provided fields in a single statement and read back the row
+    if changes:
+        stmt = update(Transaction).values(**changes).returning(*Transaction.__table__.c)
+    else:
+        stmt = select(*Transaction.__table__.c)
+
+    result = await db.execute(stmt.where(
         Transaction.id == transaction_id,
         Transaction.user_id == current_user.id
-    ).first()
+    ))
+    transaction = result.first()
 
     if not transaction:
         raise HTTPException(
@@ -122,64 +161,33 @@ def update_transaction(
             detail="Transaction not found"
         )
 
-    # Verify category if provided
-    if transaction_data.category_id is not None:
-        category = db.query(Category).filter(
-            Category.id == transaction_data.category_id,
-            Category.user_id == current_user.id
-        ).first()
-
-        if not category:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Category not found"
-            )
-
-    # Update fields
-    if transaction_data.category_id is not None:
-        transaction.category_id = transaction_data.category_id
-    if transaction_data.amount is not None:
-        transaction.amount = transaction_data.amount
-    if transaction_data.description is not None:
-        transaction.description = transaction_data.description
-    if transaction_data.type is not None:
-        transaction.type = transaction_data.type
-    if transaction_data.date is not None:
-        transaction.date = transaction_data.date
-
-    db.commit()
-    db.refresh(transaction)
+    await db.commit()
 
     # Invalidate cache
-    delete_cache(f"transactions:{current_user.id}:*")
-    delete_cache(f"analytics:{current_user.id}:*")
+    await bump_version(current_user.id, "transactions", "analytics")
 
     return transaction
 
 
 @router.delete("/{transaction_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_transaction(
+async def delete_transaction(
     transaction_id: int,
     current_user: User = Depends(get_current_user),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """Delete a transaction"""
-    transaction = db.query(Transaction).filter(
-        Transaction.id == transaction_id,
-        Transaction.user_id == current_user.id
-    ).first()
+    transaction = await db.get(Transaction, transaction_id)
 
-    if not transaction:
+    if not transaction or transaction.user_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Transaction not found"
         )
 
-    db.delete(transaction)
-    db.commit()
+    await db.delete(transaction)
+    await db.commit()
 
     # Invalidate cache
-    delete_cache(f"transactions:{current_user.id}:*")
-    delete_cache(f"analytics:{current_user.id}:*")
+    await bump_version(current_user.id, "transactions", "analytics")
 
     return None
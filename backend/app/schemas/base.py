@@ -0,0 +1,18 @@
+from functools import lru_cache
+from typing import Any, List, Type, TypeVar
+from pydantic import BaseModel, TypeAdapter
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+
+def from_orm_fast(cls: Type[ModelT], obj: Any) -> ModelT:
+    """Build a response model from a database row or ORM object without
+    re-validating it: the data was already validated on the way in"""
+    return cls.model_construct(**{field: getattr(obj, field) for field in cls.model_fields})
+
+
+@lru_cache(maxsize=None)
+def list_adapter(cls: Type[ModelT]) -> TypeAdapter[List[ModelT]]:
+    """Serializer for list responses of a model. Built on first use, so
+    models with defer_build are not built at import, and reused after"""
+    return TypeAdapter(List[cls])
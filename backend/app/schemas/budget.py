@@ -1,6 +1,5 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from datetime import date
-from typing import Optional
 from app.models.budget import BudgetPeriod
 
 
@@ -11,22 +10,25 @@ class BudgetBase(BaseModel):
     start_date: date
     end_date: date
 
+    model_config = ConfigDict(use_enum_values=True)
+
 
 class BudgetCreate(BudgetBase):
     pass
 
 
 class BudgetUpdate(BaseModel):
-    category_id: Optional[int] = None
-    amount: Optional[float] = None
-    period: Optional[BudgetPeriod] = None
-    start_date: Optional[date] = None
-    end_date: Optional[date] = None
+    category_id: int | None = None
+    amount: float | None = None
+    period: BudgetPeriod | None = None
+    start_date: date | None = None
+    end_date: date | None = None
+
+    model_config = ConfigDict(use_enum_values=True)
 
 
 class BudgetResponse(BudgetBase):
     id: int
     user_id: int
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, defer_build=True)
@@ -1,5 +1,4 @@
-from pydantic import BaseModel
-from typing import Optional
+from pydantic import BaseModel, ConfigDict
 from app.models.category import TransactionType
 
 
@@ -7,19 +6,22 @@ class CategoryBase(BaseModel):
     name: str
     type: TransactionType
 
+    model_config = ConfigDict(use_enum_values=True)
+
 
 class CategoryCreate(CategoryBase):
     pass
 
 
 class CategoryUpdate(BaseModel):
-    name: Optional[str] = None
-    type: Optional[TransactionType] = None
+    name: str | None = None
+    type: TransactionType | None = None
+
+    model_config = ConfigDict(use_enum_values=True)
 
 
 class CategoryResponse(CategoryBase):
     id: int
     user_id: int
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True, defer_build=True)
@@ -1,15 +1,17 @@
-from pydantic import BaseModel
-from datetime import date, datetime
-from typing import Optional
+from pydantic import BaseModel, ConfigDict
+import datetime as dt
+from typing import NotRequired, TypedDict
 from app.models.category import TransactionType
 
 
 class TransactionBase(BaseModel):
     category_id: int
     amount: float
-    description: Optional[str] = None
+    description: str | None = None
     type: TransactionType
-    date: date
+    date: dt.date
+
+    model_config = ConfigDict(use_enum_values=True)
 
 
 class TransactionCreate(TransactionBase):
@@ -17,17 +19,30 @@ class TransactionCreate(TransactionBase):
 
 
 class TransactionUpdate(BaseModel):
-    category_id: Optional[int] = None
-    amount: Optional[float] = None
-    description: Optional[str] = None
-    type: Optional[TransactionType] = None
-    date: Optional[date] = None
+    category_id: int | None = None
+    amount: float | None = None
+    description: str | None = None
+    type: TransactionType | None = None
+    date: dt.date | None = None
+
+    model_config = ConfigDict(use_enum_values=True)
 
 
 class TransactionResponse(TransactionBase):
     id: int
     user_id: int
-    created_at: datetime
+    created_at: dt.datetime
+
+    model_config = ConfigDict(from_attributes=True, defer_build=True)
 
-    class Config:
-        from_attributes = True
+
+class TransactionDict(TypedDict):
+    """Cached shape of a TransactionResponse, encoded directly with orjson"""
+    category_id: int
+    amount: float
+    description: NotRequired[str]
+    type: TransactionType
+    date: dt.date
+    id: int
+    user_id: int
+    created_at: dt.datetime
@@ -1,69 +1,273 @@
-import json
-from typing import Optional, Any
+import asyncio
+import hashlib
+import inspect
+import logging
+import socket
+from typing import Optional, Any, Dict, Set, Tuple
 from functools import wraps
-import redis
+from cachetools import TLRUCache
+import orjson
+from fastapi.responses import Response
+from pydantic_core import to_jsonable_python
+from redis.asyncio import BlockingConnectionPool, Redis
 from app.core.config import settings
 
-# Initialize Redis client
+logger = logging.getLogger(__name__)
+
+# TCP keepalive probes for pooled connections, as supported by the platform,
+# so idle connections are kept open instead of being dropped and redialed
+KEEPALIVE_OPTIONS = {
+    getattr(socket, name): value
+    for name, value in (("TCP_KEEPIDLE", 30), ("TCP_KEEPINTVL", 10), ("TCP_KEEPCNT", 3))
+    if hasattr(socket, name)
+}
+
+# Initialize async Redis client over a shared connection pool
+# (raw bytes: cached values are encoded JSON bodies). Connections are only
+# opened on first use. When all are busy, callers wait up to
+# POOL_TIMEOUT seconds for one instead of failing outright
+# ("Too many connections"), which would turn cache reads into misses.
+# Without a client every cache helper is a no-op
+MAX_CONNECTIONS = 128
+POOL_TIMEOUT = 1
 redis_client = None
-if settings.REDIS_URL:
+if settings.REDIS_URL and settings.CACHE_ENABLED:
     try:
-        redis_client = redis.from_url(settings.REDIS_URL, decode_responses=True)
+        pool = BlockingConnectionPool.from_url(
+            settings.REDIS_URL,
+            max_connections=MAX_CONNECTIONS,
+            timeout=POOL_TIMEOUT,
+            socket_keepalive=True,
+            socket_keepalive_options=KEEPALIVE_OPTIONS,
+            health_check_interval=30
+        )
+        redis_client = Redis(connection_pool=pool)
     except Exception:
         redis_client = None
 
+# Client methods used on every cache access, bound once rather than looked
+# up per call. Only called after the helpers have checked redis_client
+if redis_client:
+    _get = redis_client.get
+    _setex = redis_client.setex
+    _pipeline = redis_client.pipeline
+
+_dumps = orjson.dumps
+
+
+# In-process layer in front of Redis for hot keys. Entries live at most
+# L1_TTL seconds (or the Redis expiry, if shorter), which bounds how stale
+# this worker can be relative to Redis
+L1_TTL = 60
+_l1 = TLRUCache(maxsize=10_000, ttu=lambda key, entry, now: now + entry[0])
+
+# Strong references to in-flight background cache writes. Past
+# MAX_PENDING_WRITES, further writes are dropped: the cache is best-effort.
+# Kept well below MAX_CONNECTIONS, so a write backlog can never hold the
+# connections request-path reads need
+_background_tasks = set()
+MAX_PENDING_WRITES = 32
+
+# Error types of failed background writes already warned about, so an
+# outage logs one line per cause rather than one per dropped write.
+# Tracebacks go to the debug log
+_reported_errors: Set[type] = set()
+
+# Computations in progress per cache key, shared by concurrent misses
+_inflight: Dict[str, "asyncio.Future[Optional[bytes]]"] = {}
+
+# Injected dependencies that never contribute to a cache key
+UNKEYED_PARAMS = {"db", "request", "background_tasks"}
 
-def get_cache(key: str) -> Optional[Any]:
-    """Get value from cache"""
+
+async def close_cache() -> None:
+    """Release pooled Redis connections"""
+    if redis_client:
+        await redis_client.aclose()
+
+
+async def get_raw_cache(key: str) -> Optional[bytes]:
+    """Get pre-encoded bytes from cache, as stored by write_behind"""
     if not redis_client:
         return None
+    entry = _l1.get(key)
+    if entry is not None:
+        return entry[1]
     try:
-        value = redis_client.get(key)
+        # Read the remaining TTL in the same round-trip, so the local copy
+        # never outlives the Redis entry
+        pipe = _pipeline(transaction=False)
+        pipe.get(key)
+        pipe.pttl(key)
+        value, ttl_ms = await pipe.execute()
         if value:
-            return json.loads(value)
-        return None
+            _l1[key] = (min(ttl_ms / 1000, L1_TTL) if ttl_ms > 0 else L1_TTL, value)
+        return value
     except Exception:
         return None
 
 
-def set_cache(key: str, value: Any, expiry: int = 300) -> None:
-    """Set value in cache with expiry in seconds (default 5 minutes)"""
+async def _write_raw(key: str, value: bytes, expiry: int) -> None:
+    await _setex(key, expiry, value)
+    _l1[key] = (min(expiry, L1_TTL), value)
+
+
+async def get_version(user_id: int, namespace: str) -> int:
+    """Get the current cache version of a namespace for a user"""
     if not redis_client:
-        return
+        return 0
     try:
-        redis_client.setex(key, expiry, json.dumps(value))
+        return int(await _get(f"ver:{namespace}:{user_id}") or 0)
     except Exception:
-        pass
+        return 0
 
 
-def delete_cache(pattern: str) -> None:
-    """Delete cache keys matching pattern"""
+async def bump_version(user_id: int, *namespaces: str) -> None:
+    """Invalidate a user's cached namespaces by moving each to a new version.
+
+    Keys built with an old version are never read again and expire via their TTL.
+    All namespaces are bumped in a single pipelined round-trip.
+    """
     if not redis_client:
         return
     try:
-        keys = redis_client.keys(pattern)
-        if keys:
-            redis_client.delete(*keys)
+        pipe = _pipeline(transaction=False)
+        for namespace in namespaces:
+            pipe.incr(f"ver:{namespace}:{user_id}")
+        await pipe.execute()
     except Exception:
         pass
 
 
-def cache_response(key_prefix: str, expiry: int = 300):
-    """Decorator to cache function responses"""
+def _write_done(task: asyncio.Task) -> None:
+    _background_tasks.discard(task)
+    if task.cancelled():
+        return
+    exc = task.exception()
+    if exc is None:
+        # Writes work again: report the next failure afresh
+        _reported_errors.clear()
+        return
+    logger.debug("Background cache write failed", exc_info=exc)
+    if type(exc) not in _reported_errors:
+        _reported_errors.add(type(exc))
+        logger.warning("Background cache writes failing: %r", exc)
+
+
+def write_behind(key: str, value: bytes, expiry: int = 300) -> None:
+    """Store already-encoded bytes in the background, so the caller never
+    waits on Redis. Skipped while too many writes are already pending;
+    failures are logged rather than raised."""
+    if not redis_client or len(_background_tasks) >= MAX_PENDING_WRITES:
+        return
+    task = asyncio.create_task(_write_raw(key, value, expiry))
+    _background_tasks.add(task)
+    task.add_done_callback(_write_done)
+
+
+def _hashed_key(key_params: Tuple[str, ...], arguments: Dict[str, Any], defaults: Dict[str, Any]) -> str:
+    """Canonical digest of the cache-relevant call arguments.
+
+    Values are taken in the decorated function's parameter order, and each is
+    encoded and fed to the hash on its own, so no combined key string or
+    buffer is ever built.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for name in key_params:
+        value = arguments[name] if name in arguments else defaults.get(name)
+        # Responses are per user: key on the id rather than the user object
+        if name == "current_user" and value is not None:
+            value = value.id
+        h.update(_dumps(value))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def cache_response(
+    key_prefix: str,
+    expiry: int = 300,
+    namespace: Optional[str] = None
+):
+    """Decorator to cache JSON responses as encoded bytes.
+
+    The cache key is a digest of the call arguments, excluding injected
+    dependencies. With a namespace, keys are scoped to the calling user and
+    that user's namespace version, so bump_version invalidates them; the
+    route must then take a current_user parameter.
+
+    Cached results are sent as a Response with status 200, so neither
+    response_model nor a route's status_code applies to them. Results that
+    cannot be encoded as JSON are returned as they are, uncached. When
+    caching is disabled, routes are left undecorated.
+    """
     def decorator(func):
+        # Caching is off for the life of the process: leave func as it is
+        if redis_client is None:
+            return func
+
+        # Resolve once which parameters contribute to the key
+        sig = inspect.signature(func)
+        if namespace is not None and "current_user" not in sig.parameters:
+            raise TypeError(f"{func.__name__} needs a current_user parameter to cache per user")
+        key_params = tuple(name for name in sig.parameters if name not in UNKEYED_PARAMS)
+        defaults = {
+            name: param.default
+            for name, param in sig.parameters.items()
+            if param.default is not inspect.Parameter.empty
+        }
+
         @wraps(func)
         async def wrapper(*args, **kwargs):
             # Build cache key from function arguments
-            cache_key = f"{key_prefix}:{str(args)}:{str(kwargs)}"
+            try:
+                arguments = kwargs
+                if args:
+                    # FastAPI passes everything by keyword; only direct
+                    # positional calls need binding to parameter names
+                    arguments = sig.bind_partial(*args, **kwargs).arguments
+                suffix = _hashed_key(key_params, arguments, defaults)
+            except TypeError:
+                # Arguments that cannot be keyed are served uncached
+                return await func(*args, **kwargs)
+            if namespace is not None:
+                user_id = arguments["current_user"].id
+                version = await get_version(user_id, namespace)
+                cache_key = f"{namespace}:{user_id}:v{version}:{key_prefix}:{suffix}"
+            else:
+                cache_key = f"{key_prefix}:{suffix}"
+
+            # Serve hits as the stored JSON body, skipping FastAPI's encoders
+            cached_body = await get_raw_cache(cache_key)
+            if cached_body is not None:
+                return Response(content=cached_body, media_type="application/json")
 
-            # Try to get from cache
-            cached_value = get_cache(cache_key)
-            if cached_value is not None:
-                return cached_value
+            # Concurrent misses on the same key wait for the first one instead
+            # of repeating its work. Should that fail, run the call uncached
+            inflight = _inflight.get(cache_key)
+            if inflight is not None:
+                body = await asyncio.shield(inflight)
+                if body is None:
+                    return await func(*args, **kwargs)
+                return Response(content=body, media_type="application/json")
 
-            # Call function and cache result
-            result = await func(*args, **kwargs)
-            set_cache(cache_key, result, expiry)
-            return result
+            # Call function, encode the result once and cache the body without
+            # delaying the response. Pydantic models are dumped to plain data,
+            # and UTC timestamps end in Z, as Pydantic writes them
+            future = asyncio.get_running_loop().create_future()
+            _inflight[cache_key] = future
+            body = None
+            try:
+                result = await func(*args, **kwargs)
+                try:
+                    body = _dumps(result, default=to_jsonable_python, option=orjson.OPT_UTC_Z)
+                except TypeError:
+                    # Not JSON data (e.g. an ORM object left to response_model,
+                    # or a Response): let FastAPI handle it as usual
+                    return result
+            finally:
+                del _inflight[cache_key]
+                future.set_result(body)
+            write_behind(cache_key, body, expiry)
+            return Response(content=body, media_type="application/json")
         return wrapper
     return decorator
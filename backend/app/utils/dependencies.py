@@ -1,14 +1,30 @@
-from fastapi import Depends, HTTPException, status
+import time
+from datetime import date, timedelta
+from functools import lru_cache
+from typing import Optional, Tuple
+from types import SimpleNamespace
+from cachetools import TTLCache
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from app.core.database import get_db
 from app.core.security import decode_access_token
 from app.models.user import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/auth/login")
 
+# Resolved users keyed by access token, so hot endpoints skip the JWT decode
+# and user lookup on repeat requests
+_user_cache = TTLCache(maxsize=10_000, ttl=30)
+
+
+async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession = Depends(get_db)) -> User:
+    cached = _user_cache.get(token)
+    # Never serve a cached user past the token's own expiry
+    if cached is not None and cached.exp > time.time():
+        return cached
 
-def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(get_db)) -> User:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
@@ -23,8 +39,39 @@ def get_current_user(token: str = Depends(oauth2_scheme), db: Session = Depends(
     if username is None:
         raise credentials_exception
 
-    user = db.query(User).filter(User.username == username).first()
+    user = await db.scalar(select(User).where(User.username == username))
     if user is None:
         raise credentials_exception
 
-    return user
+    # Detach from the session: routes only read these columns
+    current_user = SimpleNamespace(
+        id=user.id,
+        email=user.email,
+        username=user.username,
+        created_at=user.created_at,
+        exp=payload.get("exp", 0),
+    )
+    _user_cache[token] = current_user
+
+    return current_user
+
+
+@lru_cache(maxsize=1)
+def _month_bounds(today: date) -> Tuple[date, date]:
+    """First and last day of the month containing today"""
+    start_date = date(today.year, today.month, 1)
+    if today.month == 12:
+        end_date = date(today.year + 1, 1, 1) - timedelta(days=1)
+    else:
+        end_date = date(today.year, today.month + 1, 1) - timedelta(days=1)
+    return start_date, end_date
+
+
+async def month_range(
+    start_date: Optional[date] = Query(None, description="Start date"),
+    end_date: Optional[date] = Query(None, description="End date")
+) -> Tuple[date, date]:
+    """Date range query parameters, defaulting to the current month"""
+    if start_date and end_date:
+        return start_date, end_date
+    return _month_bounds(date.today())
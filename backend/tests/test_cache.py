@@ -0,0 +1,178 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.utils import cache
+
+
+@pytest.fixture
+def store(monkeypatch):
+    """Stand in for a configured Redis with a dict of cached bodies and
+    namespace versions"""
+    data = {}
+
+    async def get(key):
+        return data.get(key)
+
+    class Pipeline:
+        def __init__(self):
+            self.keys = []
+
+        def incr(self, key):
+            self.keys.append(key)
+
+        async def execute(self):
+            for key in self.keys:
+                data[key] = data.get(key, 0) + 1
+
+    monkeypatch.setattr(cache, "redis_client", object())
+    monkeypatch.setattr(cache, "_get", get, raising=False)
+    monkeypatch.setattr(cache, "_pipeline", lambda transaction=False: Pipeline(), raising=False)
+    monkeypatch.setattr(cache, "get_raw_cache", get)
+    monkeypatch.setattr(cache, "write_behind", lambda key, value, expiry=300: data.__setitem__(key, value))
+    return data
+
+
+def test_concurrent_misses_run_handler_once(monkeypatch):
+    """Concurrent misses on one key share a single call of the route"""
+    writes = []
+
+    async def no_version(user_id, namespace):
+        return 0
+
+    async def always_miss(key):
+        return None
+
+    # Stand in for a configured Redis: every lookup misses
+    monkeypatch.setattr(cache, "redis_client", object())
+    monkeypatch.setattr(cache, "get_version", no_version)
+    monkeypatch.setattr(cache, "get_raw_cache", always_miss)
+    monkeypatch.setattr(cache, "write_behind", lambda key, value, expiry=300: writes.append(key))
+
+    calls = []
+
+    @cache.cache_response("summary", namespace="analytics")
+    async def summary(months: int, current_user=None, db=None):
+        calls.append(months)
+        await asyncio.sleep(0.05)
+        return {"months": months}
+
+    async def fire():
+        user = SimpleNamespace(id=1)
+        return await asyncio.gather(*[
+            summary(months=6, current_user=user, db=object()) for _ in range(10)
+        ])
+
+    responses = asyncio.run(fire())
+
+    assert calls == [6]
+    assert len(writes) == 1
+    assert all(r.body == b'{"months":6}' for r in responses)
+    assert not cache._inflight
+
+
+def test_bump_version_invalidates_cached_responses(store):
+    """A version bump makes the next call miss, for the bumped user only"""
+    calls = []
+
+    @cache.cache_response("summary", namespace="analytics")
+    async def summary(months: int = 6, current_user=None, db=None):
+        calls.append(current_user.id)
+        return {"calls": len(calls)}
+
+    async def run():
+        alice, bob = SimpleNamespace(id=1), SimpleNamespace(id=2)
+        await summary(current_user=alice)
+        await summary(current_user=bob)
+        await summary(current_user=alice)
+        await cache.bump_version(alice.id, "analytics", "transactions")
+        await summary(current_user=alice)
+        await summary(current_user=bob)
+
+    asyncio.run(run())
+
+    assert calls == [1, 2, 1]
+    assert store["ver:analytics:1"] == 1
+    assert store["ver:transactions:1"] == 1
+    assert "ver:analytics:2" not in store
+
+
+def test_keys_are_per_user_and_ignore_call_style(store):
+    """Positional and keyword calls share a key; different users never do"""
+    calls = []
+
+    @cache.cache_response("summary", namespace="analytics")
+    async def summary(months: int = 6, current_user=None, db=None):
+        calls.append((months, current_user.id))
+        return {"months": months}
+
+    async def run():
+        alice, bob = SimpleNamespace(id=1), SimpleNamespace(id=2)
+        await summary(6, alice)
+        await summary(months=6, current_user=alice, db=object())
+        await summary(current_user=alice)
+        await summary(6, bob)
+
+    asyncio.run(run())
+
+    assert calls == [(6, 1), (6, 2)]
+    keys = sorted(key for key in store if not key.startswith("ver:"))
+    assert [key.split(":")[:4] for key in keys] == [
+        ["analytics", "1", "v0", "summary"],
+        ["analytics", "2", "v0", "summary"],
+    ]
+
+
+def test_unencodable_results_are_returned_uncached(store):
+    """Results orjson cannot encode go back to FastAPI as they are"""
+    row = object()
+
+    @cache.cache_response("detail")
+    async def detail(item_id: int, db=None):
+        return row
+
+    result = asyncio.run(detail(item_id=1))
+
+    assert result is row
+    assert not store
+    assert not cache._inflight
+
+
+def test_write_behind_drops_writes_past_the_backlog_limit(monkeypatch):
+    """Writes beyond MAX_PENDING_WRITES are skipped rather than queued"""
+    started = []
+    monkeypatch.setattr(cache, "redis_client", object())
+
+    async def run():
+        release = asyncio.Event()
+
+        async def slow_write(key, value, expiry):
+            started.append(key)
+            await release.wait()
+
+        monkeypatch.setattr(cache, "_write_raw", slow_write)
+        for i in range(cache.MAX_PENDING_WRITES + 5):
+            cache.write_behind(f"k{i}", b"{}")
+        assert len(cache._background_tasks) == cache.MAX_PENDING_WRITES
+        await asyncio.sleep(0)
+        release.set()
+        await asyncio.gather(*list(cache._background_tasks))
+
+    asyncio.run(run())
+
+    assert len(started) == cache.MAX_PENDING_WRITES
+    assert not cache._background_tasks
+
+
+def test_caching_disabled_leaves_routes_undecorated(monkeypatch):
+    """Without a Redis client nothing is wrapped, keyed or written"""
+    monkeypatch.setattr(cache, "redis_client", None)
+
+    async def summary(months: int = 6, current_user=None):
+        return {"months": months}
+
+    assert cache.cache_response("summary", namespace="analytics")(summary) is summary
+    # Returns before scheduling anything, so no event loop is needed
+    cache.write_behind("k", b"{}")
+    assert not cache._background_tasks